@@ -1,20 +1,28 @@
 import os
+import threading
 from datetime import datetime
 
 import pandas as pd
 import requests
-import yfinance as yf
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 
 from backend.utils import (
     fetch_fund_data,
     fetch_index_data,
+    fetch_index_history,
     calculate_performance,
     ALL_FUNDS,
     INDICES,
+    latest_data_dates,
+    MFAPI_SEARCH_URL,
 )
+from backend.cache_warmer import PopularityTracker, CacheWarmer
+from backend.http_cache import conditional_response, make_etag
+from backend.live_updates import UpdateHub, stream_events
+from backend.screener import DEFAULT_LIMIT, BenchmarkUnavailable, get_table
+from backend import profiler
 
 # Compute absolute path to frontend/build
 FRONTEND_BUILD_DIR = os.path.abspath(
@@ -25,6 +33,47 @@ app = Flask(__name__, static_folder=FRONTEND_BUILD_DIR, static_url_path="")
 
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# Track which funds/indices are requested so the warmer can pre-fetch them after
+# the daily NAV publish. Every worker runs a warmer; a file lock ensures only one
+# of them does the work per publish window.
+popularity = PopularityTracker()
+if os.environ.get("CACHE_WARMER_ENABLED", "1") == "1":
+    CacheWarmer(popularity).start()
+
+# One upstream poller per (fund, index) pair, shared by every live subscriber
+live_updates = UpdateHub()
+
+
+@app.before_request
+def start_profiling():
+    """Starts a stack sampler for admin-requested or randomly sampled requests."""
+    requested = request.headers.get("X-Profile") == "1" or request.args.get("profile") == "1"
+    admin = requested and profiler.is_admin(request.headers.get("X-Admin-Token"))
+    if admin or profiler.sampled():
+        g.profile_id = profiler.new_request_id(
+            request.headers.get("X-Request-ID") if admin else None
+        )
+        g.profile_sampler = profiler.StackSampler(threading.get_ident()).start()
+
+
+@app.after_request
+def finish_profiling(response):
+    sampler = g.pop("profile_sampler", None)
+    if sampler is not None:
+        sampler.stop()
+        profiler.save_profile(
+            g.profile_id,
+            sampler,
+            {
+                "method": request.method,
+                "path": request.path,
+                "query": request.query_string.decode("utf-8", "replace"),
+                "status": response.status_code,
+            },
+        )
+        response.headers["X-Profile-Id"] = g.profile_id
+    return response
+
 
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
@@ -38,15 +87,16 @@ def serve(path):
 @app.route("/api/funds", methods=["GET"])
 def get_funds():
     """Endpoint to get the list of available mutual funds."""
-    return jsonify(ALL_FUNDS)
+    return conditional_response(lambda: make_etag(ALL_FUNDS), lambda: jsonify(ALL_FUNDS))
 
 
 @app.route("/api/indices", methods=["GET"])
 def get_indices():
     """Endpoint to get the list of available indices."""
     # Return the predefined list of indices {Display Name: Symbol}
-    return jsonify(
-        list(INDICES.keys())
+    return conditional_response(
+        lambda: make_etag(list(INDICES.keys())),
+        lambda: jsonify(list(INDICES.keys())),
     )  # Return only the display names for the dropdown
 
 
@@ -83,10 +133,33 @@ def compare_performance():
         pass  # Allow codes not in the static list for now
         # return jsonify({"error": f"Invalid scheme code: {scheme_code}"}), 400
 
+    def etag():
+        # Versioned by the latest published data, so a 304 needs no fetching or computation
+        fund_date, index_date = latest_data_dates(scheme_code, index_symbol)
+        if fund_date and index_date:
+            return make_etag(
+                scheme_code, index_symbol, start_date_str, end_date_str, fund_date, index_date
+            )
+        return None
+
+    response = conditional_response(
+        etag,
+        lambda: build_comparison(
+            scheme_code, index_name, index_symbol, start_date, end_date
+        ),
+    )
+    # Only count schemes that exist, so junk codes never reach the popularity file
+    if response.status_code in (200, 304):
+        popularity.record(scheme_code, index_symbol)
+    return response
+
+
+def build_comparison(scheme_code, index_name, index_symbol, start_date, end_date):
+    """Fetches fund and index data and builds the comparison response."""
     # --- Data Fetching and Processing ---
     try:
         print(
-            f"Fetching data for Fund: {scheme_code}, Index: {index_symbol} ({index_name}) from {start_date_str} to {end_date_str}"
+            f"Fetching data for Fund: {scheme_code}, Index: {index_symbol} ({index_name}) from {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
         )
 
         fund_result = fetch_fund_data(scheme_code, start_date, end_date)
@@ -189,6 +262,82 @@ def compare_performance():
         return jsonify({"error": "An internal server error occurred"}), 500
 
 
+@app.route("/api/compare/stream", methods=["GET"])
+def stream_comparison():
+    """Server-Sent Events stream of points published after the client's last date."""
+    scheme_code = request.args.get("scheme_code")
+    index_name = request.args.get("index_name")
+    start_date_str = request.args.get("start_date")
+    # Browsers resend the last event id when they reconnect
+    since_str = request.headers.get("Last-Event-ID") or request.args.get("since")
+
+    if not all([scheme_code, index_name, start_date_str, since_str]):
+        return jsonify({"error": "Missing required parameters"}), 400
+
+    try:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        since_str = datetime.strptime(since_str, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    index_symbol = INDICES.get(index_name)
+    if not index_symbol:
+        return jsonify({"error": f"Invalid index name: {index_name}"}), 400
+
+    # Streams hold a thread each, so cap them to keep threads free for other routes
+    if not live_updates.open_stream():
+        return (
+            jsonify({"error": "Too many live update streams, try again later"}),
+            503,
+            {"Retry-After": "60"},
+        )
+
+    events = stream_events(live_updates, scheme_code, index_symbol, start_date, since_str)
+    response = Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs even if the client disconnects before the stream starts
+    response.call_on_close(live_updates.close_stream)
+    return response
+
+
+@app.route("/api/screener", methods=["GET"])
+def screen_funds():
+    """Endpoint to filter and sort schemes by category and precomputed metrics.
+
+    Example: /api/screener?category=equity&plan=direct&option=growth
+        &cagr_5y__gt=Nifty 50&max_drawdown__lt=30&volatility__lt=15&sort=-cagr_5y
+    """
+    # "profile" switches on the profiler and "_"-prefixed args are cache busters
+    filters = {
+        key: value
+        for key, value in request.args.items()
+        if key not in ("sort", "limit", "profile") and not key.startswith("_") and value
+    }
+    table = get_table()
+    if table is None:
+        return (
+            jsonify({"error": "Screener data is still being prepared, try again shortly"}),
+            503,
+            {"Retry-After": "30"},
+        )
+
+    try:
+        limit = int(request.args.get("limit", DEFAULT_LIMIT))
+        count, results = table.query(filters, request.args.get("sort"), limit)
+    except BenchmarkUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"An error occurred: {e}")  # Log the error server-side
+        return jsonify({"error": "An internal server error occurred"}), 500
+
+    return jsonify({"count": count, "results": results})
+
+
 @app.route("/api/funds/search", methods=["GET"])
 def search_funds():
     """Endpoint to search for mutual funds using the MFAPI."""
@@ -198,7 +347,7 @@ def search_funds():
 
     try:
         # Call the MFAPI search endpoint
-        response = requests.get(f"https://api.mfapi.in/mf/search", params={"q": query})
+        response = requests.get(MFAPI_SEARCH_URL, params={"q": query})
         response.raise_for_status()  # Raise an exception for bad status codes
 
         # Return the search results directly
@@ -209,27 +358,47 @@ def search_funds():
 
 @app.route("/api/index-data", methods=["GET"])
 def get_index_data():
+    symbol = request.args.get("symbol")
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+
+    if not all([symbol, start_date, end_date]):
+        return jsonify({"error": "Missing required parameters"}), 400
+
     try:
-        symbol = request.args.get("symbol")
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
 
-        if not all([symbol, start_date, end_date]):
-            return jsonify({"error": "Missing required parameters"}), 400
+    # Only known symbols are served, since each one stores its full history in the shared cache
+    if symbol not in INDICES.values():
+        return jsonify({"error": f"Unsupported index symbol: {symbol}"}), 400
 
-        # Fetch data using yfinance
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(start=start_date, end=end_date)
+    def etag():
+        _, index_date = latest_data_dates(index_symbol=symbol)
+        return make_etag(symbol, start_date, end_date, index_date) if index_date else None
 
-        if df.empty:
-            return jsonify({"error": "No data available for the specified range"}), 404
+    return conditional_response(
+        etag, lambda: build_index_data(symbol, start_date, end_date)
+    )
+
+
+def build_index_data(symbol, start_date, end_date):
+    """Returns daily closes for a symbol between start_date (inclusive) and end_date (exclusive)."""
+    try:
+        # Served from the cached full history rather than a yfinance call per request
+        history = fetch_index_history(symbol)
 
         # Convert data to list of dictionaries
-        data = []
-        for index, row in df.iterrows():
-            data.append(
-                {"date": index.strftime("%Y-%m-%d"), "close": float(row["Close"])}
-            )
+        data = [
+            {"date": date, "close": close}
+            for date, close in history
+            if start_date <= date < end_date
+        ]
+
+        if not data:
+            return jsonify({"error": "No data available for the specified range"}), 404
 
         return jsonify(data)
 
@@ -237,6 +406,30 @@ def get_index_data():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/admin/profiles", methods=["GET"])
+def list_profiles():
+    """Endpoint to list recently captured request profiles (admin only)."""
+    if not profiler.is_admin(request.headers.get("X-Admin-Token")):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(profiler.list_profiles())
+
+
+@app.route("/api/admin/profiles/<profile_id>", methods=["GET"])
+def download_profile(profile_id):
+    """Endpoint to download a profile as collapsed stacks for flamegraph.pl or speedscope."""
+    if not profiler.is_admin(request.headers.get("X-Admin-Token")):
+        return jsonify({"error": "Forbidden"}), 403
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        return jsonify({"error": f"Profile not found: {profile_id}"}), 404
+    return send_file(
+        path,
+        mimetype="text/plain",
+        as_attachment=True,
+        download_name=f"{profile_id}.folded",
+    )
+
+
 if __name__ == "__main__":
     # Get port from environment variable or default to 5001
     port = int(os.environ.get("PORT", 5001))
@@ -0,0 +1,106 @@
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+try:
+    import fcntl  # Not available on Windows; locking is skipped there
+except ImportError:
+    fcntl = None
+
+# NAVs are published once a day in the evening (IST). Anything fetched before the
+# most recent publish (plus the MFAPI update delay) is considered stale.
+IST = timezone(timedelta(hours=5, minutes=30))
+NAV_PUBLISH_HOUR = int(os.environ.get("NAV_PUBLISH_HOUR", 23))
+# MFAPI picks up the AMFI NAV file some time after it is published; data fetched
+# before publish + this delay may still be the previous day's
+NAV_UPDATE_DELAY_MINUTES = int(os.environ.get("NAV_UPDATE_DELAY_MINUTES", 30))
+
+# Shared on-disk store so every gunicorn worker sees the same cached series
+CACHE_DIR = os.environ.get(
+    "MF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mf_cache")
+)
+
+
+def last_publish_time(now=None):
+    """Returns the most recent NAV publish time at or before `now` (IST)."""
+    now = now or datetime.now(IST)
+    publish = now.replace(hour=NAV_PUBLISH_HOUR, minute=0, second=0, microsecond=0)
+    if publish > now:
+        publish -= timedelta(days=1)
+    return publish
+
+
+def next_publish_time(now=None):
+    """Returns the next NAV publish time after `now` (IST)."""
+    return last_publish_time(now) + timedelta(days=1)
+
+
+def last_refresh_time(now=None):
+    """Returns the most recent time (IST) after which upstream data is expected to be current.
+
+    Anything fetched before this is stale, including fetches made between the
+    publish time and MFAPI picking up the new NAVs.
+    """
+    now = now or datetime.now(IST)
+    delay = timedelta(minutes=NAV_UPDATE_DELAY_MINUTES)
+    return last_publish_time(now - delay) + delay
+
+
+def next_refresh_time(now=None):
+    """Returns the next time (IST) at which cached data becomes stale."""
+    return last_refresh_time(now) + timedelta(days=1)
+
+
+def cache_path(*parts):
+    """Builds a path inside the cache directory, creating parent folders."""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def _entry_path(kind, key):
+    # Index symbols like '^NSEI' are not safe file names everywhere
+    safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", str(key))
+    return cache_path(kind, f"{safe_key}.json")
+
+
+def load_series(kind, key, allow_stale=False):
+    """Loads a cached series, or None if missing or fetched before the last refresh time."""
+    try:
+        with open(_entry_path(kind, key), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not allow_stale and entry.get("fetched_at", 0) < last_refresh_time().timestamp():
+        return None
+    return entry.get("data")
+
+
+def store_series(kind, key, data):
+    """Writes a series to the cache atomically so concurrent readers never see partial files."""
+    path = _entry_path(kind, key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "data": data}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error writing cache entry {kind}/{key}: {e}")
+
+
+@contextmanager
+def file_lock(name):
+    """Exclusive advisory lock shared by all processes using the same cache directory."""
+    with open(cache_path(f"{name}.lock"), "a+") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
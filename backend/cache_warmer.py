@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.cache import cache_path, file_lock, last_refresh_time
+from backend.nav_arena import nav_arena
+from backend.screener import refresh_table
+from backend.utils import fetch_fund_history, fetch_index_history
+
+WARM_TOP_N = int(os.environ.get("CACHE_WARM_TOP_N", 20))
+WARM_CONCURRENCY = int(os.environ.get("CACHE_WARM_CONCURRENCY", 4))
+# How often each worker merges its request counts into the shared file
+FLUSH_INTERVAL_SECONDS = 60
+# Older popularity counts are halved after every warm so the ranking follows recent traffic
+POPULARITY_DECAY = 0.5
+# Keys whose decayed count falls below this are dropped, so the file only keeps recent keys
+POPULARITY_MIN_COUNT = 0.5
+
+
+class PopularityTracker:
+    """Counts requests per scheme code and index symbol, shared across workers via a JSON file."""
+
+    def __init__(self):
+        self._pending = {"funds": Counter(), "indices": Counter()}
+        self._lock = threading.Lock()
+
+    def record(self, scheme_code, index_symbol):
+        with self._lock:
+            self._pending["funds"][scheme_code] += 1
+            self._pending["indices"][index_symbol] += 1
+
+    def _read(self):
+        try:
+            with open(cache_path("popularity.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"funds": {}, "indices": {}}
+
+    def _write(self, counts):
+        path = cache_path("popularity.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(counts, f)
+        os.replace(f"{path}.tmp", path)
+
+    def flush(self, decay=None):
+        """Merges this worker's pending counts into the shared file, optionally decaying old counts."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {"funds": Counter(), "indices": Counter()}
+        if decay is None and not any(pending.values()):
+            # Nothing to merge; the file is replaced atomically, so no lock is needed
+            return self._read()
+
+        with file_lock("popularity"):
+            counts = self._read()
+            for kind, counter in pending.items():
+                merged = counts.setdefault(kind, {})
+                if decay is not None:
+                    for key in list(merged):
+                        merged[key] *= decay
+                        if merged[key] < POPULARITY_MIN_COUNT:
+                            del merged[key]
+                for key, count in counter.items():
+                    merged[key] = merged.get(key, 0) + count
+            self._write(counts)
+        return counts
+
+    def top(self, n):
+        """Returns the n most requested scheme codes and index symbols."""
+        counts = self.flush()
+        return tuple(
+            [key for key, _ in Counter(counts.get(kind, {})).most_common(n)]
+            for kind in ("funds", "indices")
+        )
+
+
+class CacheWarmer:
+    """Refreshes the most popular series into the cache once per NAV publish window."""
+
+    def __init__(self, tracker, top_n=WARM_TOP_N, concurrency=WARM_CONCURRENCY):
+        self.tracker = tracker
+        self.top_n = top_n
+        self.concurrency = concurrency
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.tracker.flush()
+                window = self._due_window()
+                if self._claim_window(window):
+                    self.warm(window)
+            except Exception as e:
+                print(f"Cache warmer error: {e}")
+            time.sleep(FLUSH_INTERVAL_SECONDS)
+
+    def _due_window(self):
+        # Due once MFAPI is expected to have the new NAVs, same as cache freshness
+        return last_refresh_time().isoformat()
+
+    def _claim_window(self, window):
+        """Returns True for exactly one worker per publish window."""
+        with file_lock("warmer"):
+            marker = cache_path("warmer_window.txt")
+            try:
+                with open(marker, "r", encoding="utf-8") as f:
+                    if f.read().strip() == window:
+                        return False
+            except OSError:
+                pass
+            with open(marker, "w", encoding="utf-8") as f:
+                f.write(window)
+            return True
+
+    def warm(self, window=None):
+        """Fetches the top-N funds and indices with bounded concurrency."""
+        funds, indices = self.tracker.top(self.top_n)
+        print(f"Warming cache for window {window}: {len(funds)} funds, {len(indices)} indices")
+
+        def refresh(job):
+            fetch, key = job
+            try:
+                return fetch(key)
+            except Exception as e:
+                print(f"Error warming cache for {key}: {e}")
+                return None
+
+        jobs = [(fetch_fund_history, code) for code in funds]
+        jobs += [
+            (lambda symbol: fetch_index_history(symbol, refresh=True), symbol)
+            for symbol in indices
+        ]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(refresh, jobs))
+
+        # Write all refreshed NAV series into the arena as one new segment
+        histories = {code: data for code, data in zip(funds, results) if data}
+        if histories:
+            nav_arena.add(histories)
+
+        # Rebuild screener metrics off the request path now that the data is fresh
+        refresh_table()
+
+        self.tracker.flush(decay=POPULARITY_DECAY)
@@ -0,0 +1,40 @@
+import hashlib
+import json
+from datetime import datetime
+
+from flask import make_response, request
+
+from backend.cache import IST, next_refresh_time
+
+
+def make_etag(*parts):
+    """Builds a strong ETag value from JSON-serialisable parts."""
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def cache_control():
+    """Lets clients reuse responses until the next NAV update, when the data can change."""
+    max_age = int((next_refresh_time() - datetime.now(IST)).total_seconds())
+    return f"public, max-age={max(max_age, 0)}"
+
+
+def conditional_response(etag_func, build):
+    """Returns a 304 when the client already has the current version, otherwise build()'s response.
+
+    `etag_func` returns the ETag for the request, or None when it cannot be known
+    cheaply (e.g. data not cached yet); it is tried again after building.
+    """
+    etag = etag_func()
+    # If-None-Match uses weak comparison, so tags a proxy marked W/ after compressing still match
+    if etag and request.if_none_match.contains_weak(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+        etag = etag or etag_func()
+
+    if etag:
+        response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control()
+    return response
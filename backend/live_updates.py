@@ -0,0 +1,167 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from backend.utils import fetch_fund_data, fetch_index_data
+
+# How often each (fund, index) poller checks for newly published points. Upstream
+# calls go through the shared cache, so they only happen once per publish window.
+POLL_INTERVAL_SECONDS = int(os.environ.get("LIVE_POLL_SECONDS", 300))
+# SSE comment sent when idle so proxies do not close the connection
+KEEPALIVE_SECONDS = 15
+# Each open stream holds a request thread for its whole lifetime; beyond this many
+# per worker new streams are refused so regular requests always have threads left
+MAX_STREAMS = int(os.environ.get("LIVE_MAX_STREAMS", 4))
+
+
+def common_points(scheme_code, index_symbol, start_date, end_date):
+    """Returns [(date, nav, price)] for dates where both the fund and index have data."""
+    fund_df = fetch_fund_data(scheme_code, start_date, end_date)
+    index_df = fetch_index_data(index_symbol, start_date, end_date)
+    if not isinstance(fund_df, pd.DataFrame) or not isinstance(index_df, pd.DataFrame):
+        return []
+    combined = pd.merge(fund_df, index_df, left_index=True, right_index=True, how="inner")
+    return [
+        (date.strftime("%Y-%m-%d"), float(row.nav), float(row.price))
+        for date, row in combined.iterrows()
+    ]
+
+
+def _next_day(date_str):
+    return datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)
+
+
+class _Poller:
+    """Polls one (fund, index) pair and fans new points out to every subscriber."""
+
+    def __init__(self, hub, key, last_date):
+        self.hub = hub
+        self.key = key
+        self.last_date = last_date
+        self.subscribers = set()
+        self.thread = threading.Thread(
+            target=self._run, name=f"live-{key[0]}-{key[1]}", daemon=True
+        )
+
+    def _run(self):
+        while True:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            with self.hub.lock:
+                if not self.subscribers:
+                    del self.hub.pollers[self.key]
+                    return
+            try:
+                points = common_points(
+                    *self.key, _next_day(self.last_date), datetime.now()
+                )
+            except Exception as e:
+                print(f"Error polling live updates for {self.key}: {e}")
+                continue
+            if not points:
+                continue
+            self.last_date = points[-1][0]
+            with self.hub.lock:
+                for subscriber in self.subscribers:
+                    subscriber.put(points)
+
+
+class UpdateHub:
+    """Shares one poller per (scheme_code, index_symbol) across all SSE subscribers in the process."""
+
+    def __init__(self, max_streams=MAX_STREAMS):
+        self.lock = threading.Lock()
+        self.pollers = {}
+        self.max_streams = max_streams
+        self.open_streams = 0
+
+    def open_stream(self):
+        """Reserves a stream slot, returning False when the worker is at its limit."""
+        with self.lock:
+            if self.open_streams >= self.max_streams:
+                return False
+            self.open_streams += 1
+            return True
+
+    def close_stream(self):
+        with self.lock:
+            self.open_streams -= 1
+
+    def subscribe(self, scheme_code, index_symbol, since):
+        """Registers a subscriber and returns (queue, catch-up points after `since`)."""
+        key = (scheme_code, index_symbol)
+        catch_up = common_points(scheme_code, index_symbol, _next_day(since), datetime.now())
+        last_date = catch_up[-1][0] if catch_up else since
+
+        subscriber = queue.Queue()
+        with self.lock:
+            poller = self.pollers.get(key)
+            if poller is None:
+                poller = self.pollers[key] = _Poller(self, key, last_date)
+                poller.thread.start()
+            poller.subscribers.add(subscriber)
+        return subscriber, catch_up
+
+    def unsubscribe(self, scheme_code, index_symbol, subscriber):
+        with self.lock:
+            poller = self.pollers.get((scheme_code, index_symbol))
+            if poller is not None:
+                poller.subscribers.discard(subscriber)
+
+
+def stream_events(hub, scheme_code, index_symbol, start_date, since):
+    """Yields SSE messages with the points published after `since`.
+
+    Normalized values use the subscriber's own base (the first common point on or
+    after start_date), matching what /api/compare returned for the same range.
+    """
+    base = common_points(scheme_code, index_symbol, start_date, _next_day(since))
+    if not base:
+        yield _event("error", {"error": "No overlapping data for the selected start date"})
+        return
+    _, base_nav, base_price = base[0]
+
+    subscriber, catch_up = hub.subscribe(scheme_code, index_symbol, since)
+    last_sent = since
+    try:
+        pending = catch_up
+        while True:
+            # Points can arrive both in the catch-up and from the poller; send each once
+            points = [p for p in pending if p[0] > last_sent]
+            if points:
+                last_sent = points[-1][0]
+                yield _event("points", _payload(points, base_nav, base_price), last_sent)
+            try:
+                pending = subscriber.get(timeout=KEEPALIVE_SECONDS)
+            except queue.Empty:
+                pending = []
+                yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(scheme_code, index_symbol, subscriber)
+
+
+def _normalize(value, base):
+    # calculate_performance leaves values unnormalized when the base is zero
+    return round(value / base * 100 if base else value, 2)
+
+
+def _payload(points, base_nav, base_price):
+    # Same keys and rounding as /api/compare so the chart can append directly
+    return {
+        "labels": [date for date, _, _ in points],
+        "fund_performance": [_normalize(nav, base_nav) for _, nav, _ in points],
+        "index_performance": [_normalize(price, base_price) for _, _, price in points],
+        "fund_actual_values": [round(nav, 2) for _, nav, _ in points],
+        "index_actual_values": [round(price, 2) for _, _, price in points],
+    }
+
+
+def _event(name, data, event_id=None):
+    message = f"event: {name}\n"
+    if event_id:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data)}\n\n"
@@ -0,0 +1,235 @@
+"""Open-loop load generator for the Flask API.
+
+Requests are issued on a fixed schedule at the target RPS (independent of how fast
+the server answers). Latency is measured from each request's scheduled start, so
+time spent waiting for a free client thread (once --concurrency requests are in
+flight) counts too, and server queueing is not hidden by the generator.
+
+The stubs replace yfinance: with YAHOO_CHART_URL set the app reads index history
+with a direct chart API call, so these numbers exclude yfinance's own download
+overhead.
+
+The app keeps every fund and index it has fetched in MF_CACHE_DIR until the next
+NAV publish, so only the first request per scheme reaches the stubs. Start the
+app with a fresh MF_CACHE_DIR and pass it as --cache-dir: the report then says
+whether the cache was cold at the start, and /api/compare latencies are split
+into each scheme's first request and its repeats (served from the cache).
+
+    # Terminal 1: stubs
+    python -m backend.loadtest.stubs serve --port 8001 --latency-ms 150
+
+    # Terminal 2: the app, pointed at the stubs, with an empty cache
+    export MF_CACHE_DIR=$(mktemp -d) && echo $MF_CACHE_DIR
+    MFAPI_BASE_URL=http://localhost:8001 \\
+    YAHOO_CHART_URL='http://localhost:8001/v8/finance/chart/{}' \\
+    gunicorn backend.app:app --bind localhost:5001 --workers 4
+
+    # Terminal 3: 30 RPS for 60 seconds
+    python -m backend.loadtest.run --target http://localhost:5001 --rps 30 --duration 60 \\
+        --cache-dir <MF_CACHE_DIR from terminal 2>
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+# (endpoint, weight) - roughly how the frontend mixes its calls
+DEFAULT_MIX = [("/api/compare", 8), ("/api/funds/search", 2)]
+SEARCH_TERMS = ["hdfc", "icici", "axis", "nifty", "bluechip", "debt", "elss"]
+RANGES_YEARS = [1, 3, 5, 10]
+
+
+def build_request(endpoint, scheme_codes, index_names):
+    """Returns (path, params) for one randomised request to an endpoint."""
+    if endpoint == "/api/compare":
+        end = datetime.now()
+        start = end - timedelta(days=365 * random.choice(RANGES_YEARS))
+        return endpoint, {
+            "scheme_code": random.choice(scheme_codes),
+            "index_name": random.choice(index_names),
+            "start_date": start.strftime("%Y-%m-%d"),
+            "end_date": end.strftime("%Y-%m-%d"),
+        }
+    if endpoint == "/api/funds/search":
+        return endpoint, {"q": random.choice(SEARCH_TERMS)}
+    return endpoint, {}
+
+
+def cache_state(cache_dir):
+    """Returns 'cold' if the app's cache directory holds no fund or index series yet, else 'warm'."""
+    from backend.nav_arena import INDEX_FILE
+
+    if os.path.exists(os.path.join(cache_dir, INDEX_FILE)):
+        return "warm"
+    indices = os.path.join(cache_dir, "indices")
+    if os.path.isdir(indices) and any(name.endswith(".json") for name in os.listdir(indices)):
+        return "warm"
+    return "cold"
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, endpoint, latency_ms, ok):
+        with self._lock:
+            self.latencies[endpoint].append(latency_ms)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        rows = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            rows[endpoint] = {
+                "requests": len(values),
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "error_rate": round(self.errors[endpoint] / len(values), 4),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(values[-1], 1),
+            }
+        return rows
+
+
+def run(target, rps, duration, mix, scheme_codes, index_names, timeout, concurrency):
+    results = Results()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    endpoints = [endpoint for endpoint, _ in mix]
+    weights = [weight for _, weight in mix]
+    seen_schemes = set()
+    seen_lock = threading.Lock()
+
+    def fire(endpoint, scheduled):
+        path, params = build_request(endpoint, scheme_codes, index_names)
+        label = endpoint
+        if "scheme_code" in params:
+            # Repeats of a scheme are served from the app's cache, so report them apart
+            with seen_lock:
+                first = params["scheme_code"] not in seen_schemes
+                seen_schemes.add(params["scheme_code"])
+            label = f"{endpoint} ({'first' if first else 'repeat'})"
+        try:
+            response = session.get(target + path, params=params, timeout=timeout)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        # Measured from the scheduled start to avoid coordinated omission
+        results.add(label, (time.perf_counter() - scheduled) * 1000, ok)
+
+    total = int(rps * duration)
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(total):
+            # Sleep until this request's scheduled start time
+            scheduled = began + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(fire, random.choices(endpoints, weights)[0], scheduled)
+    elapsed = time.perf_counter() - began
+    return results.report(elapsed)
+
+
+def print_report(rows, cache):
+    header = f"{'endpoint':<24}{'reqs':>7}{'rps':>8}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in rows.items():
+        print(
+            f"{endpoint:<24}{row['requests']:>7}{row['throughput_rps']:>8}"
+            f"{row['error_rate'] * 100:>6.1f}%{row['p50_ms']:>9}{row['p95_ms']:>9}"
+            f"{row['p99_ms']:>9}{row['max_ms']:>9}"
+        )
+    print("\nLatency is measured from the scheduled start of each request.")
+    print("Index fetches go through YAHOO_CHART_URL when set, bypassing yfinance.")
+    if cache == "unknown":
+        print("App cache at start: unknown (pass --cache-dir to check it)")
+    else:
+        print(f"App cache at start: {cache}")
+
+
+def main():
+    from backend.utils import ALL_FUNDS, INDICES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default="http://localhost:5001")
+    parser.add_argument("--rps", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--concurrency", type=int, default=200, help="Max in-flight requests")
+    parser.add_argument(
+        "--mix",
+        default=",".join(f"{e}={w}" for e, w in DEFAULT_MIX),
+        help="Comma separated endpoint=weight pairs",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument(
+        "--cache-dir",
+        help="The app's MF_CACHE_DIR, to report whether the run started with a cold cache",
+    )
+    parser.add_argument(
+        "--start-stubs",
+        type=int,
+        metavar="PORT",
+        help="Also start the MFAPI/Yahoo stubs in this process on PORT",
+    )
+    parser.add_argument("--stub-latency-ms", type=float, default=0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.start_stubs:
+        from backend.loadtest.stubs import start_in_background
+
+        start_in_background(
+            args.start_stubs,
+            latency_ms=args.stub_latency_ms,
+            error_rate=args.stub_error_rate,
+        )
+
+    mix = []
+    for pair in args.mix.split(","):
+        endpoint, _, weight = pair.partition("=")
+        mix.append((endpoint, float(weight or 1)))
+
+    cache = cache_state(args.cache_dir) if args.cache_dir else "unknown"
+    rows = run(
+        args.target,
+        args.rps,
+        args.duration,
+        mix,
+        [f["schemeCode"] for f in ALL_FUNDS],
+        list(INDICES.keys()),
+        args.timeout,
+        args.concurrency,
+    )
+    if args.json:
+        print(json.dumps({"cache": cache, "endpoints": rows}, indent=2))
+    else:
+        print_report(rows, cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Local stand-ins for MFAPI and the Yahoo chart API.
+
+Serves recorded payloads from backend/loadtest/payloads (or a synthetic series when
+nothing is recorded) with configurable latency and error injection.
+
+    # Record real payloads once
+    python -m backend.loadtest.stubs record --scheme 119551 120503 --index ^NSEI
+
+    # Serve them on port 8001
+    python -m backend.loadtest.stubs serve --port 8001 --latency-ms 150 --error-rate 0.02
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import requests
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(__file__), "payloads")
+REAL_MFAPI_URL = "https://api.mfapi.in/mf/{}"
+REAL_CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{}"
+# Number of daily points in synthetic series (~10 years)
+SYNTHETIC_DAYS = 3650
+
+
+def _payload_path(kind, key):
+    safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+    return os.path.join(PAYLOAD_DIR, kind, f"{safe_key}.json")
+
+
+def _load_payload(kind, key):
+    try:
+        with open(_payload_path(kind, key), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _synthetic_points(key):
+    """Deterministic random walk so unrecorded codes still return realistic sized payloads."""
+    rng = random.Random(key)
+    start = datetime.now() - timedelta(days=SYNTHETIC_DAYS)
+    value = rng.uniform(10, 500)
+    points = []
+    for day in range(SYNTHETIC_DAYS):
+        date = start + timedelta(days=day)
+        if date.weekday() >= 5:
+            continue
+        value *= math.exp(rng.gauss(0.0004, 0.01))
+        points.append((date, value))
+    return points
+
+
+@lru_cache(maxsize=None)
+def mfapi_payload(scheme_code):
+    payload = _load_payload("mfapi", scheme_code)
+    if payload is None:
+        points = _synthetic_points(scheme_code)
+        payload = {
+            "meta": {"scheme_code": scheme_code, "scheme_name": f"Synthetic Fund {scheme_code}"},
+            "data": [
+                {"date": date.strftime("%d-%m-%Y"), "nav": f"{nav:.4f}"}
+                for date, nav in reversed(points)  # MFAPI returns newest first
+            ],
+            "status": "SUCCESS",
+        }
+    return payload
+
+
+@lru_cache(maxsize=None)
+def chart_payload(symbol):
+    payload = _load_payload("chart", symbol)
+    if payload is None:
+        points = _synthetic_points(symbol)
+        payload = {
+            "chart": {
+                "result": [
+                    {
+                        "meta": {"symbol": symbol},
+                        "timestamp": [int(date.timestamp()) for date, _ in points],
+                        "indicators": {"quote": [{"close": [round(p, 2) for _, p in points]}]},
+                    }
+                ],
+                "error": None,
+            }
+        }
+    return payload
+
+
+def search_payload(query):
+    payload = _load_payload("search", query.lower())
+    if payload is None:
+        from backend.utils import ALL_FUNDS
+
+        payload = [
+            {"schemeCode": int(f["schemeCode"]), "schemeName": f["schemeName"]}
+            for f in ALL_FUNDS
+            if query.lower() in f["schemeName"].lower()
+        ]
+    return payload
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Set by make_server
+    latency_ms = 0
+    jitter_ms = 0
+    error_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass  # Keep load runs quiet
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if random.random() < self.error_rate:
+            self._send_json(503, {"error": "Injected failure"})
+            return
+
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        if parts == ["mf", "search"]:
+            query = parse_qs(url.query).get("q", [""])[0]
+            self._send_json(200, search_payload(query))
+        elif len(parts) == 2 and parts[0] == "mf":
+            self._send_json(200, mfapi_payload(parts[1]))
+        elif len(parts) == 4 and parts[:3] == ["v8", "finance", "chart"]:
+            self._send_json(200, chart_payload(parts[3]))
+        else:
+            self._send_json(404, {"error": f"Unknown stub path {url.path}"})
+
+
+def make_server(port, latency_ms=0, jitter_ms=0, error_rate=0.0):
+    handler = type(
+        "ConfiguredStubHandler",
+        (StubHandler,),
+        {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate},
+    )
+    return ThreadingHTTPServer(("localhost", port), handler)
+
+
+def start_in_background(port, **kwargs):
+    """Starts the stub server on a daemon thread and returns it."""
+    server = make_server(port, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record(scheme_codes, symbols):
+    """Saves real upstream payloads so the stubs can replay them."""
+    for code in scheme_codes:
+        response = requests.get(REAL_MFAPI_URL.format(code), timeout=30)
+        response.raise_for_status()
+        _save("mfapi", code, response.json())
+    for symbol in symbols:
+        response = requests.get(
+            REAL_CHART_URL.format(symbol),
+            params={"period1": 0, "period2": int(time.time()), "interval": "1d"},
+            headers={"User-Agent": "Mozilla/5.0"},
+            timeout=30,
+        )
+        response.raise_for_status()
+        _save("chart", symbol, response.json())
+
+
+def _save(kind, key, payload):
+    path = _payload_path(kind, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    print(f"Recorded {kind} payload for {key} -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Serve recorded payloads")
+    serve.add_argument("--port", type=int, default=8001)
+    serve.add_argument("--latency-ms", type=float, default=0)
+    serve.add_argument("--jitter-ms", type=float, default=0)
+    serve.add_argument("--error-rate", type=float, default=0.0)
+
+    rec = commands.add_parser("record", help="Record payloads from the real APIs")
+    rec.add_argument("--scheme", nargs="*", default=[])
+    rec.add_argument("--index", nargs="*", default=[])
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.scheme, args.index)
+        return
+
+    server = make_server(args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Stub MFAPI/Yahoo server listening on http://localhost:{args.port}")
+    print(f"  MFAPI_BASE_URL=http://localhost:{args.port}")
+    print(f"  YAHOO_CHART_URL=http://localhost:{args.port}/v8/finance/chart/{{}}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from backend.cache import cache_path, file_lock, last_refresh_time
+
+# The arena is a set of append-only segment files, each laid out as:
+#   int32   day offsets since 1970-01-01, padded to an 8 byte boundary
+#   float64 NAVs (float32 cannot hold 4 decimals on 5 digit NAVs exactly)
+# The sidecar index maps scheme code -> [segment, start, length, fetched_at] and
+# segment -> size. Adding series writes a new segment holding only those series,
+# so other schemes are never copied; segments no scheme points at are deleted.
+INDEX_FILE = "nav_arena.json"
+
+
+def _padded(size):
+    return (size * 4 + 7) // 8 * 8
+
+
+def _segment_path(segment):
+    return cache_path(f"nav_arena.{segment}.bin")
+
+
+def _parse_mfapi(data):
+    """Converts MFAPI [{'date': 'dd-mm-YYYY', 'nav': '...'}] rows into sorted day/NAV arrays."""
+    days = np.array(
+        [f"{row['date'][6:]}-{row['date'][3:5]}-{row['date'][:2]}" for row in data],
+        dtype="datetime64[D]",
+    ).astype(np.int32)
+    navs = np.array([float(row["nav"]) for row in data], dtype=np.float64)
+    order = np.argsort(days, kind="stable")
+    return days[order], navs[order]
+
+
+def to_day(date):
+    """Converts a date/datetime into the arena's int32 day offset."""
+    return int(np.datetime64(date.strftime("%Y-%m-%d"), "D").astype(np.int64))
+
+
+def _read_index():
+    try:
+        with open(cache_path(INDEX_FILE), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if "segments" in index:
+            return index
+    except (OSError, ValueError):
+        pass
+    # Missing, unreadable or written by an older layout: start empty
+    return {"segments": {}, "schemes": {}}
+
+
+class NavArena:
+    """Read-only memory-mapped NAV store shared by every worker on the host.
+
+    Workers map segment files read-only, so the OS keeps a single physical copy.
+    Writers only hold the file lock while updating the small index, so reads
+    never wait for series to be written.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index_version = None
+        self._schemes = {}
+        self._segment_sizes = {}
+        self._maps = {}
+
+    def _refresh(self):
+        """Reloads the index if another process (or thread) has changed it."""
+        try:
+            stat = os.stat(cache_path(INDEX_FILE))
+        except OSError:
+            return
+        # The index is replaced atomically, so a new inode means a new version
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if version == self._index_version:
+            return
+        index = _read_index()
+        self._index_version = version
+        self._schemes = index["schemes"]
+        self._segment_sizes = index["segments"]
+        # Drop mappings of segments that were deleted
+        for segment in list(self._maps):
+            if segment not in self._segment_sizes:
+                del self._maps[segment]
+
+    def _map(self, segment):
+        if segment not in self._maps:
+            size = self._segment_sizes[segment]
+            path = _segment_path(segment)
+            self._maps[segment] = (
+                np.memmap(path, dtype=np.int32, mode="r", shape=(size,)),
+                np.memmap(path, dtype=np.float64, mode="r", offset=_padded(size), shape=(size,)),
+            )
+        return self._maps[segment]
+
+    def get(self, scheme_code):
+        """Returns zero-copy (days, navs) views for a scheme, or None if missing or stale."""
+        with self._lock:
+            self._refresh()
+            entry = self._schemes.get(scheme_code)
+            if entry is None:
+                return None
+            segment, start, length, fetched_at = entry
+            if fetched_at < last_refresh_time().timestamp():
+                return None
+            try:
+                days, navs = self._map(segment)
+            except OSError:
+                # The segment was replaced and removed after we read the index
+                return None
+        return (
+            np.asarray(days[start:start + length]),
+            np.asarray(navs[start:start + length]),
+        )
+
+    def add(self, histories):
+        """Stores {scheme_code: MFAPI data} histories in a new segment and returns their views."""
+        parsed = {code: _parse_mfapi(data) for code, data in histories.items() if data}
+        if not parsed:
+            return {}
+        fetched_at = time.time()
+
+        # Write the segment without holding any lock; its name is unique
+        segment = f"{os.getpid()}-{threading.get_ident()}-{time.time_ns()}"
+        entries, size = {}, 0
+        path = _segment_path(segment)
+        with open(f"{path}.tmp", "wb") as f:
+            for code, (days, navs) in parsed.items():
+                f.write(days.astype(np.int32).tobytes())
+                entries[code] = [segment, size, len(days), fetched_at]
+                size += len(days)
+            f.write(b"\0" * (_padded(size) - size * 4))
+            for days, navs in parsed.values():
+                f.write(navs.astype(np.float64).tobytes())
+        os.replace(f"{path}.tmp", path)
+
+        with file_lock("nav_arena"):
+            index = _read_index()
+            index["schemes"].update(entries)
+            index["segments"][segment] = size
+            live = {entry[0] for entry in index["schemes"].values()}
+            dead = [s for s in index["segments"] if s not in live]
+            for s in dead:
+                del index["segments"][s]
+
+            with open(cache_path(f"{INDEX_FILE}.tmp"), "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(cache_path(f"{INDEX_FILE}.tmp"), cache_path(INDEX_FILE))
+
+            # Workers still mapping a deleted segment keep its pages until they remap
+            for s in dead:
+                try:
+                    os.remove(_segment_path(s))
+                except OSError:
+                    pass
+
+        return {code: self.get(code) for code in parsed}
+
+
+nav_arena = NavArena()
@@ -0,0 +1,140 @@
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from backend.cache import cache_path
+
+# Profiling on demand requires this token; without it only sampled traffic is profiled
+ADMIN_TOKEN = os.environ.get("PROFILER_ADMIN_TOKEN")
+# Fraction of requests (0-1) profiled automatically
+SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_MS", 5)) / 1000
+# Number of most recent profiles kept on disk
+KEEP_PROFILES = int(os.environ.get("PROFILE_KEEP", 100))
+PROFILE_DIR = "profiles"
+
+
+def is_admin(token):
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def sampled():
+    """Picks a random SAMPLE_RATE fraction of requests for profiling."""
+    return SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval from a background thread.
+
+    Only the thread handling the request is sampled; work it hands to other
+    threads (e.g. yfinance download threads) shows up as time spent waiting.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        """Returns the samples in the collapsed-stack format used by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def new_request_id(header_value=None):
+    # Only pass a client-supplied id for admin requests; anyone else could reuse an
+    # existing id to overwrite its profile. It must also be safe as a file name.
+    if header_value and header_value.replace("-", "").isalnum() and len(header_value) <= 64:
+        return header_value
+    return uuid.uuid4().hex
+
+
+def save_profile(request_id, sampler, meta):
+    """Writes the folded stacks and metadata for a request, keeping only recent profiles."""
+    meta = {
+        **meta,
+        "id": request_id,
+        "created_at": time.time(),
+        "duration_ms": round(sampler.duration * 1000, 1),
+        "samples": sum(sampler.stacks.values()),
+    }
+    with open(cache_path(PROFILE_DIR, f"{request_id}.folded"), "w", encoding="utf-8") as f:
+        f.write(sampler.folded())
+    with open(cache_path(PROFILE_DIR, f"{request_id}.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    _prune()
+
+
+def _prune():
+    """Deletes all but the newest KEEP_PROFILES profiles, using one directory scan."""
+    directory = os.path.dirname(cache_path(PROFILE_DIR, ""))
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith(".json")]
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for entry in entries[KEEP_PROFILES:]:
+        request_id = entry.name[: -len(".json")]
+        for ext in ("folded", "json"):
+            try:
+                os.remove(os.path.join(directory, f"{request_id}.{ext}"))
+            except OSError:
+                pass
+
+
+def list_profiles():
+    """Returns profile metadata, newest first."""
+    profiles = []
+    # cache_path creates the profiles folder if it does not exist yet
+    directory = os.path.dirname(cache_path(PROFILE_DIR, ""))
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda p: p.get("created_at", 0), reverse=True)
+
+
+def profile_path(request_id):
+    """Returns the folded profile path for a request id, or None if it does not exist."""
+    if not request_id.replace("-", "").isalnum():
+        return None
+    path = cache_path(PROFILE_DIR, f"{request_id}.folded")
+    return path if os.path.exists(path) else None
@@ -0,0 +1,261 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.cache import last_refresh_time
+from backend.nav_arena import nav_arena
+from backend.utils import ALL_FUNDS, INDICES, fetch_fund_history, fetch_index_history
+
+# Drawdown and volatility are measured over the trailing window; CAGRs per horizon
+WINDOW_YEARS = 5
+CAGR_YEARS = (1, 3, 5)
+METRICS = [f"cagr_{years}y" for years in CAGR_YEARS] + ["max_drawdown", "volatility"]
+# A horizon counts as covered if the series starts at most this many days after it
+HISTORY_TOLERANCE_DAYS = 7
+TRADING_DAYS = 252
+
+# Checked in order, so e.g. "Hybrid Equity" is hybrid and "Banking & PSU Debt" is debt
+CATEGORY_KEYWORDS = [
+    ("hybrid", ["hybrid", "balanced", "arbitrage", "multi asset", "equity savings", "asset allocation"]),
+    ("debt", ["debt", "bond", "gilt", "liquid", "money market", "overnight", "credit risk",
+              "duration", "fmp", "fixed maturity", "corporate", "floater", "banking & psu",
+              "banking and psu", "sdl", "g-sec", "target maturity"]),
+    ("equity", ["equity", "elss", "tax saver", "bluechip", "large cap", "largecap", "mid cap",
+                "midcap", "small cap", "smallcap", "multi cap", "multicap", "flexi cap",
+                "flexicap", "value fund", "value discovery", "technology", "index", "nifty",
+                "sensex", "focused", "banking", "psu", "pharma", "infrastructure",
+                "consumption", "dividend yield", "contra"]),
+]
+FILTER_OPS = {
+    "gt": np.greater,
+    "gte": np.greater_equal,
+    "lt": np.less,
+    "lte": np.less_equal,
+}
+DEFAULT_LIMIT = 50
+# Parallel MFAPI fetches while building the table
+BUILD_CONCURRENCY = 4
+# A table built while some upstream fetches failed is rebuilt after this delay
+RETRY_SECONDS = 300
+
+
+class BenchmarkUnavailable(Exception):
+    """A filter refers to a known index whose metrics could not be computed."""
+
+
+def classify(scheme_name):
+    """Derives (category, plan, option) from an AMFI-style scheme name."""
+    name = scheme_name.lower()
+    category = next(
+        (cat for cat, words in CATEGORY_KEYWORDS if any(w in name for w in words)), "other"
+    )
+    plan = "direct" if "direct" in name else "regular"
+    if "idcw" in name or ("dividend" in name and "dividend yield" not in name):
+        option = "idcw"
+    elif "growth" in name:
+        option = "growth"
+    else:
+        option = "other"
+    return category, plan, option
+
+
+def series_metrics(days, values):
+    """Computes {metric: value} for a sorted day/value series (NaN when history is too short)."""
+    metrics = dict.fromkeys(METRICS, math.nan)
+    if len(days) < 2:
+        return metrics
+
+    end_day = int(days[-1])
+    for years in CAGR_YEARS:
+        start_day = end_day - round(365.25 * years)
+        if days[0] > start_day + HISTORY_TOLERANCE_DAYS:
+            continue
+        i = np.searchsorted(days, start_day)
+        if values[i] > 0 and end_day > days[i]:
+            growth = values[-1] / values[i]
+            metrics[f"cagr_{years}y"] = (growth ** (365.25 / (end_day - days[i])) - 1) * 100
+
+    window = values[np.searchsorted(days, end_day - round(365.25 * WINDOW_YEARS)):]
+    window = window[window > 0]
+    if len(window) >= 2:
+        metrics["max_drawdown"] = float(np.max(1 - window / np.maximum.accumulate(window)) * 100)
+        returns = np.diff(np.log(window))
+        metrics["volatility"] = float(np.std(returns) * math.sqrt(TRADING_DAYS) * 100)
+    return metrics
+
+
+class MetricsTable:
+    """Columnar per-scheme metrics with a presorted index per metric column."""
+
+    def __init__(self, funds, benchmarks, window):
+        self.window = window
+        self.codes = np.array([f["schemeCode"] for f in funds], dtype=object)
+        self.names = np.array([f["schemeName"] for f in funds], dtype=object)
+        categories = [classify(f["schemeName"]) for f in funds]
+        self.columns = {
+            "category": np.array([c[0] for c in categories], dtype=object),
+            "plan": np.array([c[1] for c in categories], dtype=object),
+            "option": np.array([c[2] for c in categories], dtype=object),
+        }
+        for metric in METRICS:
+            self.columns[metric] = np.array([f["metrics"][metric] for f in funds], dtype=np.float64)
+        # argsort puts NaN last, so schemes without enough history sort to the end
+        self.sorted_index = {metric: np.argsort(self.columns[metric], kind="stable") for metric in METRICS}
+        self.benchmarks = benchmarks
+
+    def _threshold(self, metric, value):
+        """Resolves a filter value: a number, or an index name meaning that index's metric."""
+        if value in self.benchmarks:
+            return self.benchmarks[value][metric]
+        if value in INDICES:
+            raise BenchmarkUnavailable(f"Metrics for {value} are not available right now")
+        try:
+            return float(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for {metric}: {value}")
+
+    def query(self, filters, sort=None, limit=DEFAULT_LIMIT):
+        """Returns (matching row count, rows) for {'field' or 'metric__op': value} filters."""
+        if limit <= 0:
+            raise ValueError("limit must be a positive integer")
+        mask = np.ones(len(self.codes), dtype=bool)
+        for key, value in filters.items():
+            field, _, op = key.partition("__")
+            if field in ("category", "plan", "option") and not op:
+                mask &= np.isin(self.columns[field], value.lower().split(","))
+            elif field == "q" and not op:
+                mask &= np.array([value.lower() in n.lower() for n in self.names], dtype=bool)
+            elif field in METRICS and op in FILTER_OPS:
+                # Comparisons with NaN are False, so short histories never match
+                with np.errstate(invalid="ignore"):
+                    mask &= FILTER_OPS[op](self.columns[field], self._threshold(field, value))
+            else:
+                raise ValueError(f"Unsupported filter: {key}")
+
+        if sort:
+            metric = sort.lstrip("-")
+            if metric not in METRICS:
+                raise ValueError(f"Unsupported sort field: {sort}")
+            order = self.sorted_index[metric]
+            if sort.startswith("-"):
+                # Descending, still keeping NaN at the end
+                values = self.columns[metric][order]
+                order = np.concatenate([order[~np.isnan(values)][::-1], order[np.isnan(values)]])
+            rows = order[mask[order]]
+        else:
+            rows = np.flatnonzero(mask)
+        return len(rows), [self._row(i) for i in rows[:limit]]
+
+    def _row(self, i):
+        row = {"schemeCode": self.codes[i], "schemeName": self.names[i]}
+        for field, column in self.columns.items():
+            value = column[i]
+            if isinstance(value, float):
+                value = None if math.isnan(value) else round(value, 2)
+            row[field] = value
+        return row
+
+
+def _fund_series(codes):
+    """Returns ({code: (days, navs)}, failed fetch count), fetching schemes missing from the arena."""
+    series = {code: nav_arena.get(code) for code in codes}
+
+    def fetch(code):
+        try:
+            return code, fetch_fund_history(code)
+        except Exception as e:
+            print(f"Error fetching fund data for screener {code}: {e}")
+            return code, e
+
+    with ThreadPoolExecutor(max_workers=BUILD_CONCURRENCY) as executor:
+        missing = dict(executor.map(fetch, [c for c, s in series.items() if s is None]))
+    failed = sum(isinstance(data, Exception) for data in missing.values())
+    fetched = {code: data for code, data in missing.items() if not isinstance(data, Exception)}
+    if any(fetched.values()):
+        series.update(nav_arena.add(fetched))
+    return series, failed
+
+
+def _index_series(symbol):
+    history = fetch_index_history(symbol)
+    days = np.array([date for date, _ in history], dtype="datetime64[D]").astype(np.int32)
+    return days, np.array([close for _, close in history], dtype=np.float64)
+
+
+def build_table():
+    """Builds the metrics table; its window is None if any upstream fetch failed."""
+    window = last_refresh_time().isoformat()
+    funds = []
+    series, failed = _fund_series([f["schemeCode"] for f in ALL_FUNDS])
+    for fund in ALL_FUNDS:
+        days, navs = series.get(fund["schemeCode"]) or ([], [])
+        funds.append({**fund, "metrics": series_metrics(days, navs)})
+
+    benchmarks = {}
+    for name, symbol in INDICES.items():
+        try:
+            days, closes = _index_series(symbol)
+        except Exception as e:
+            print(f"Error computing screener benchmark for {symbol}: {e}")
+            failed += 1
+            continue
+        # yfinance usually returns an empty frame rather than raising when it fails
+        if len(days) == 0:
+            print(f"No history for screener benchmark {symbol}")
+            failed += 1
+            continue
+        benchmarks[name] = series_metrics(days, closes)
+
+    if failed:
+        print(f"Screener table built with {failed} failed fetches, retrying in {RETRY_SECONDS}s")
+    return MetricsTable(funds, benchmarks, None if failed else window)
+
+
+_table = None
+_building = False
+_last_attempt = 0.0
+_table_lock = threading.Lock()
+
+
+def refresh_table():
+    """Builds a new metrics table and swaps it in; the previous table is served meanwhile."""
+    global _table, _building, _last_attempt
+    with _table_lock:
+        if _building:
+            return
+        _building = True
+        _last_attempt = time.time()
+    try:
+        table = build_table()
+        with _table_lock:
+            _table = table
+    except Exception as e:
+        print(f"Error building screener table: {e}")
+    finally:
+        with _table_lock:
+            _building = False
+
+
+def get_table():
+    """Returns the current metrics table, or None before the first build finishes.
+
+    A table from an older NAV publish window is still returned while a new one is
+    built in the background, so queries never wait for MFAPI or Yahoo. Failed or
+    incomplete builds are retried after RETRY_SECONDS.
+    """
+    window = last_refresh_time().isoformat()
+    with _table_lock:
+        table, building, last_attempt = _table, _building, _last_attempt
+    if table is not None and table.window == window:
+        due = False
+    elif table is not None and table.window is not None:
+        # A complete table from the previous window: rebuild right away
+        due = True
+    else:
+        due = time.time() - last_attempt >= RETRY_SECONDS
+    if due and not building:
+        threading.Thread(target=refresh_table, name="screener-build", daemon=True).start()
+    return table
@@ -1,8 +1,14 @@
+import os
+
 import requests
+import numpy as np
 import pandas as pd
 # from nsepy import get_history # No longer using nsepy
 import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+from backend.cache import load_series, store_series
+from backend.nav_arena import nav_arena, to_day
 
 # Placeholder for MF list - ideally fetched from MFAPI or a static source
 # Fetching the full list from MFAPI on every request might be slow.
@@ -52,35 +58,51 @@ INDICES = {
     # e.g., "Nifty Pharma": "^CNXPHARMA" might work, but needs verification.
 }
 
-MFAPI_URL = "https://api.mfapi.in/mf/{}"
+# Upstream endpoints can be pointed at local stand-ins (see backend/loadtest)
+MFAPI_BASE_URL = os.environ.get("MFAPI_BASE_URL", "https://api.mfapi.in")
+MFAPI_URL = MFAPI_BASE_URL + "/mf/{}"
+MFAPI_SEARCH_URL = MFAPI_BASE_URL + "/mf/search"
+# Optional Yahoo chart API URL template ('{}' is the symbol); when set, index history
+# is read from it directly instead of through yfinance. Used by the load-test stubs,
+# so load-test numbers do not include the yfinance code path
+YAHOO_CHART_URL = os.environ.get("YAHOO_CHART_URL")
+
+def fetch_fund_history(scheme_code):
+    """Fetches the full MFAPI NAV history for a scheme (callers store it in the NAV arena)."""
+    response = requests.get(MFAPI_URL.format(scheme_code))
+    response.raise_for_status() # Raise an exception for bad status codes
+    return response.json()["data"]
 
 def fetch_fund_data(scheme_code, start_date, end_date):
-    """Fetches mutual fund NAV data from MFAPI."""
+    """Fetches mutual fund NAV data from MFAPI.
+
+    The returned 'nav' column is a zero-copy, read-only view into the shared NAV arena.
+    """
     try:
-        response = requests.get(MFAPI_URL.format(scheme_code))
-        response.raise_for_status() # Raise an exception for bad status codes
-        data = response.json()["data"]
+        series = nav_arena.get(scheme_code)
+        if series is None:
+            data = fetch_fund_history(scheme_code)
 
-        if not data:
-            # Return None instead of empty DataFrame if no data found by API
-            print(f"No data returned from MFAPI for {scheme_code}")
-            return None
+            if not data:
+                # Return None instead of empty DataFrame if no data found by API
+                print(f"No data returned from MFAPI for {scheme_code}")
+                return None
 
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y')
-        df['nav'] = pd.to_numeric(df['nav'])
-        df = df.set_index('date')
-        df = df.sort_index()
+            series = nav_arena.add({scheme_code: data})[scheme_code]
 
-        # Filter by date range
-        df = df[(df.index >= start_date) & (df.index <= end_date)]
+        days, navs = series
 
-        if df.empty:
+        # Filter by date range (days are sorted, so slicing keeps the views zero-copy)
+        lo = np.searchsorted(days, to_day(start_date), side='left')
+        hi = np.searchsorted(days, to_day(end_date), side='right')
+
+        if lo >= hi:
              # Return None if filtering results in empty dataframe
             print(f"No data found for {scheme_code} within the specified date range.")
             return None
 
-        return df[['nav']]
+        index = pd.DatetimeIndex(days[lo:hi].astype('datetime64[D]').astype('datetime64[ns]'), name='date')
+        return pd.DataFrame(navs[lo:hi, None], index=index, columns=['nav'], copy=False)
 
     except requests.exceptions.RequestException as e:
         print(f"Error fetching fund data for {scheme_code}: {e}")
@@ -91,46 +113,99 @@ def fetch_fund_data(scheme_code, start_date, end_date):
         # Return the exception object
         return e
 
+def fetch_index_history(index_symbol, refresh=False):
+    """Returns the full [date, close] history for an index, served from the cache when fresh."""
+    history = None if refresh else load_series("indices", index_symbol)
+    if history is not None:
+        return history
+
+    if YAHOO_CHART_URL:
+        history = _fetch_chart_history(index_symbol)
+        store_series("indices", index_symbol, history)
+        return history
+
+    # Download the full history once so any date range can be served from the cache
+    print(f"Calling yf.download(ticker='{index_symbol}', period='max')")
+    data = yf.download(index_symbol, period='max')
+    print(f"yfinance returned DataFrame with {len(data)} rows for {index_symbol}")
+
+    if data.empty:
+        print(f"yfinance returned empty DataFrame for {index_symbol}")
+        return []
+
+    # Ensure we are selecting the 'Close' column correctly
+    if 'Close' not in data.columns:
+        print(f"Error: 'Close' column not found in yfinance data for {index_symbol}. Columns: {data.columns}")
+        raise ValueError(f"'Close' column missing in yfinance data for {index_symbol}")
+
+    # Convert Series to DataFrame, naming the column 'price' EXPLICITLY
+    df = pd.DataFrame(data['Close'])
+    df.columns = ['price'] # Directly assign the column name
+
+    history = [
+        [date.strftime('%Y-%m-%d'), float(price)]
+        for date, price in df['price'].dropna().items()
+    ]
+    store_series("indices", index_symbol, history)
+    return history
+
+def _fetch_chart_history(index_symbol):
+    """Reads the full [date, close] history from a Yahoo v8 chart endpoint."""
+    response = requests.get(
+        YAHOO_CHART_URL.format(index_symbol),
+        params={"period1": 0, "period2": int(datetime.now().timestamp()), "interval": "1d"},
+    )
+    response.raise_for_status()
+    result = response.json()["chart"]["result"][0]
+    closes = result["indicators"]["quote"][0]["close"]
+    return [
+        [datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d'), float(close)]
+        for ts, close in zip(result.get("timestamp", []), closes)
+        if close is not None
+    ]
+
 def fetch_index_data(index_symbol, start_date, end_date):
     """Fetches index data using yfinance."""
     try:
-        # yfinance end date is exclusive, so add one day to include the end_date
-        end_date_yf = end_date + timedelta(days=1)
+        history = fetch_index_history(index_symbol)
 
-        # Format dates for yfinance (YYYY-MM-DD string is fine)
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date_yf.strftime('%Y-%m-%d')
+        if not history:
+            return None
 
-        print(f"Calling yf.download(ticker='{index_symbol}', start='{start_str}', end='{end_str}')")
-        data = yf.download(index_symbol, start=start_str, end=end_str)
-        print(f"yfinance returned DataFrame with {len(data)} rows for {index_symbol}")
+        df = pd.DataFrame(history, columns=['date', 'price'])
+        df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+        df = df.set_index('date')
+
+        # Filter by date range (end_date inclusive)
+        df = df[(df.index >= start_date) & (df.index < end_date + timedelta(days=1))]
 
-        if data.empty:
-            print(f"yfinance returned empty DataFrame for {index_symbol}")
+        if df.empty:
+            print(f"No index data found for {index_symbol} within the specified date range.")
             return None
 
-        # Ensure we are selecting the 'Close' column correctly
-        if 'Close' not in data.columns:
-            print(f"Error: 'Close' column not found in yfinance data for {index_symbol}. Columns: {data.columns}")
-            return ValueError(f"'Close' column missing in yfinance data for {index_symbol}") 
-        
-        # Select the 'Close' column Series
-        close_series = data['Close']
-        
-        # Convert Series to DataFrame, naming the column 'price' EXPLICITLY
-        df = pd.DataFrame(close_series)
-        df.columns = ['price'] # Directly assign the column name
-        
-        # Ensure index is timezone-naive
-        if df.index.tz is not None:
-            df.index = df.index.tz_localize(None)
-            
         return df
 
     except Exception as e:
         print(f"Error fetching index data for {index_symbol} using yfinance: {e}")
         return e
 
+def latest_data_dates(scheme_code=None, index_symbol=None):
+    """Returns the latest cached (fund NAV date, index date), or None for any series not cached yet.
+
+    Only reads the NAV arena and the index cache, so it is cheap enough to run
+    before deciding whether a response needs to be computed at all.
+    """
+    fund_date = index_date = None
+    if scheme_code:
+        series = nav_arena.get(scheme_code)
+        if series is not None and len(series[0]):
+            fund_date = str(np.datetime64(int(series[0][-1]), 'D'))
+    if index_symbol:
+        history = load_series("indices", index_symbol)
+        if history:
+            index_date = history[-1][0]
+    return fund_date, index_date
+
 def calculate_performance(fund_df, index_df):
     """Normalizes and aligns fund and index data, returning both normalized and actual values."""
     # Check if inputs are valid DataFrames before proceeding
@@ -1,4 +1,4 @@
-import React, { useState, useCallback } from 'react';
+import React, { useState, useCallback, useEffect } from 'react';
 import axios from 'axios';
 import { Container, CssBaseline, Box, CircularProgress, Alert, Typography, Grid, Button, Stack } from '@mui/material';
 import { format } from 'date-fns';
@@ -22,6 +22,7 @@ function App() {
   const [chartData, setChartData] = useState(null); // Stores data for the chart
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [liveParams, setLiveParams] = useState(null); // Live update subscription for the current chart
 
   // Format date to YYYY-MM-DD for API
   const formatDate = (date) => format(date, 'yyyy-MM-dd');
@@ -43,6 +44,7 @@ function App() {
     setLoading(true);
     setError(null);
     setChartData(null); // Clear previous chart while loading
+    setLiveParams(null);
 
     try {
       const params = {
@@ -57,6 +59,15 @@ function App() {
           ...response.data,
           fund_name: selectedFund.schemeName
         });
+        // Only ranges ending today can receive newly published points
+        if (params.end_date >= formatDate(new Date())) {
+          setLiveParams({
+            scheme_code: params.scheme_code,
+            index_name: params.index_name,
+            start_date: params.start_date,
+            since: response.data.labels[response.data.labels.length - 1],
+          });
+        }
       } else if (response.data && response.data.error) {
         setError(response.data.error);
       } else {
@@ -72,6 +83,24 @@ function App() {
     }
   }, [selectedFund, selectedIndex, startDate, endDate]); // Dependencies for the callback
 
+  // Subscribe to newly published points for the current chart instead of refetching it
+  useEffect(() => {
+    if (!liveParams) return undefined;
+    const source = new EventSource(`${API_URL}/compare/stream?${new URLSearchParams(liveParams)}`);
+    source.addEventListener('points', (event) => {
+      const points = JSON.parse(event.data);
+      setChartData((prev) => prev && ({
+        ...prev,
+        labels: [...prev.labels, ...points.labels],
+        fund_performance: [...prev.fund_performance, ...points.fund_performance],
+        index_performance: [...prev.index_performance, ...points.index_performance],
+        fund_actual_values: [...prev.fund_actual_values, ...points.fund_actual_values],
+        index_actual_values: [...prev.index_actual_values, ...points.index_actual_values],
+      }));
+    });
+    return () => source.close();
+  }, [liveParams]);
+
   // Handler for predefined date range clicks
   const handlePredefinedRange = (start, end) => {
     setStartDate(start);
@@ -87,6 +116,7 @@ function App() {
     setStartDate(subYears(new Date(), 1));
     setEndDate(new Date());
     setChartData(null);
+    setLiveParams(null);
     setError(null);
     setLoading(false);
   };
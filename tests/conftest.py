@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Must be set before backend modules are imported: they read these at import time
+os.environ.setdefault("MF_CACHE_DIR", tempfile.mkdtemp(prefix="mf_cache_test_"))
+os.environ.setdefault("CACHE_WARMER_ENABLED", "0")
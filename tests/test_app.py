@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+import backend.app as app_module
+
+
+def _frame(column, values):
+    index = pd.date_range("2024-01-01", periods=len(values), freq="D", name="date")
+    return pd.DataFrame({column: values}, index=index)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(
+        app_module, "fetch_fund_data", lambda *args: _frame("nav", [10.0, 11.0, 12.0])
+    )
+    monkeypatch.setattr(
+        app_module, "fetch_index_data", lambda *args: _frame("price", [100.0, 90.0, 120.0])
+    )
+    return app_module.app.test_client()
+
+
+def test_compare_returns_normalized_series(client):
+    response = client.get(
+        "/api/compare",
+        query_string={
+            "scheme_code": "119551",
+            "index_name": "Nifty 50",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-03",
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["labels"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert data["fund_performance"] == [100.0, 110.0, 120.0]
+    assert data["index_performance"] == [100.0, 90.0, 120.0]
+    assert "Cache-Control" in response.headers
+
+
+def test_compare_rejects_missing_parameters(client):
+    response = client.get("/api/compare", query_string={"scheme_code": "119551"})
+
+    assert response.status_code == 400
+
+
+def test_stream_refused_when_worker_at_limit(client, monkeypatch):
+    monkeypatch.setattr(app_module.live_updates, "max_streams", 0)
+
+    response = client.get(
+        "/api/compare/stream",
+        query_string={
+            "scheme_code": "119551",
+            "index_name": "Nifty 50",
+            "start_date": "2024-01-01",
+            "since": "2024-01-03",
+        },
+    )
+
+    assert response.status_code == 503
+    assert app_module.live_updates.open_streams == 0
+
+
+def test_index_data_rejects_unknown_symbols(client):
+    response = client.get(
+        "/api/index-data",
+        query_string={"symbol": "EVIL", "start_date": "2024-01-01", "end_date": "2024-01-10"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_screener_ignores_profile_and_cache_buster_args(client, monkeypatch):
+    from backend.screener import METRICS, MetricsTable
+
+    fund = {
+        "schemeCode": "1",
+        "schemeName": "A Gilt Fund - Direct Plan - Growth",
+        "metrics": dict.fromkeys(METRICS, 1.0),
+    }
+    monkeypatch.setattr(app_module, "get_table", lambda: MetricsTable([fund], {}, "window"))
+
+    response = client.get("/api/screener", query_string={"category": "debt", "profile": "1", "_": "123"})
+
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 1
+
+
+def test_compare_only_records_popularity_for_successful_requests(client, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(app_module.popularity, "record", lambda *args: recorded.append(args))
+    monkeypatch.setattr(app_module, "fetch_fund_data", lambda *args: None)
+    query = {
+        "scheme_code": "not-a-scheme",
+        "index_name": "Nifty 50",
+        "start_date": "2024-01-01",
+        "end_date": "2024-01-03",
+    }
+
+    assert client.get("/api/compare", query_string=query).status_code == 404
+    assert recorded == []
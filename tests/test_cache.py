@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from backend.cache import IST, last_refresh_time, next_refresh_time
+
+
+def test_fetch_between_publish_and_mfapi_update_is_not_fresh():
+    # 23:10 IST: NAVs are published but MFAPI may still serve yesterday's data
+    now = datetime(2024, 3, 5, 23, 10, tzinfo=IST)
+
+    assert last_refresh_time(now) == datetime(2024, 3, 4, 23, 30, tzinfo=IST)
+    assert next_refresh_time(now) == datetime(2024, 3, 5, 23, 30, tzinfo=IST)
+
+
+def test_refresh_time_after_mfapi_update():
+    now = datetime(2024, 3, 5, 23, 45, tzinfo=IST)
+
+    assert last_refresh_time(now) == datetime(2024, 3, 5, 23, 30, tzinfo=IST)
@@ -0,0 +1,44 @@
+import pytest
+
+from backend import cache
+from backend.cache_warmer import CacheWarmer, PopularityTracker
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+
+
+def test_top_merges_counts_from_every_tracker():
+    first, second = PopularityTracker(), PopularityTracker()
+    first.record("100", "^NSEI")
+    second.record("200", "^NSEI")
+    second.record("200", "^BSESN")
+    second.flush()
+
+    funds, indices = first.top(1)
+
+    assert funds == ["200"]
+    assert indices == ["^NSEI"]
+
+
+def test_decay_drops_keys_that_are_no_longer_requested():
+    tracker = PopularityTracker()
+    for _ in range(4):
+        tracker.record("100", "^NSEI")
+    tracker.record("junk", "^NSEI")
+    tracker.flush()
+
+    counts = tracker.flush(decay=0.5)
+    assert counts["funds"] == {"100": 2, "junk": 0.5}
+
+    counts = tracker.flush(decay=0.5)
+    assert counts["funds"] == {"100": 1}
+
+
+def test_only_one_warmer_claims_each_window():
+    first, second = CacheWarmer(PopularityTracker()), CacheWarmer(PopularityTracker())
+
+    assert first._claim_window("2024-01-01T23:30:00+05:30")
+    assert not second._claim_window("2024-01-01T23:30:00+05:30")
+    assert second._claim_window("2024-01-02T23:30:00+05:30")
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+import backend.app as app_module
+
+COMPARE_QUERY = {
+    "scheme_code": "119551",
+    "index_name": "Nifty 50",
+    "start_date": "2024-01-01",
+    "end_date": "2024-01-03",
+}
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+    index = pd.date_range("2024-01-01", periods=3, freq="D", name="date")
+
+    def fund_data(*args):
+        calls.append("fund")
+        return pd.DataFrame({"nav": [10.0, 11.0, 12.0]}, index=index)
+
+    def index_data(*args):
+        calls.append("index")
+        return pd.DataFrame({"price": [100.0, 90.0, 120.0]}, index=index)
+
+    monkeypatch.setattr(app_module, "fetch_fund_data", fund_data)
+    monkeypatch.setattr(app_module, "fetch_index_data", index_data)
+    monkeypatch.setattr(
+        app_module, "latest_data_dates", lambda *args, **kwargs: ("2024-01-03", "2024-01-03")
+    )
+    return calls
+
+
+def test_matching_etag_returns_304_without_fetching(fetches):
+    client = app_module.app.test_client()
+    etag = client.get("/api/compare", query_string=COMPARE_QUERY).headers["ETag"]
+    fetches.clear()
+
+    response = client.get("/api/compare", query_string=COMPARE_QUERY, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert fetches == []
+
+
+def test_weak_etag_from_proxy_still_matches(fetches):
+    client = app_module.app.test_client()
+    etag = client.get("/api/compare", query_string=COMPARE_QUERY).headers["ETag"]
+
+    response = client.get(
+        "/api/compare", query_string=COMPARE_QUERY, headers={"If-None-Match": f"W/{etag}"}
+    )
+
+    assert response.status_code == 304
+
+
+def test_newer_nav_date_changes_etag(fetches, monkeypatch):
+    client = app_module.app.test_client()
+    etag = client.get("/api/compare", query_string=COMPARE_QUERY).headers["ETag"]
+    monkeypatch.setattr(
+        app_module, "latest_data_dates", lambda *args, **kwargs: ("2024-01-04", "2024-01-03")
+    )
+
+    response = client.get("/api/compare", query_string=COMPARE_QUERY, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_error_responses_have_no_etag(fetches, monkeypatch):
+    monkeypatch.setattr(app_module, "fetch_fund_data", lambda *args: None)
+
+    response = app_module.app.test_client().get("/api/compare", query_string=COMPARE_QUERY)
+
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from backend import live_updates
+from backend.live_updates import UpdateHub, stream_events
+
+POINTS = [
+    ("2024-01-01", 10.0, 100.0),
+    ("2024-01-02", 11.0, 110.0),
+    ("2024-01-03", 12.0, 90.0),
+    ("2024-01-04", 13.0, 95.0),
+]
+
+
+@pytest.fixture(autouse=True)
+def upstream(monkeypatch):
+    published = POINTS[:3]
+
+    def common_points(scheme_code, index_symbol, start_date, end_date):
+        start, end = f"{start_date:%Y-%m-%d}", f"{end_date:%Y-%m-%d}"
+        return [p for p in published if start <= p[0] < end]
+
+    monkeypatch.setattr(live_updates, "common_points", common_points)
+
+
+def _data(message):
+    lines = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return lines.get("id"), json.loads(lines["data"])
+
+
+def test_stream_sends_catch_up_normalized_to_start_date():
+    events = stream_events(UpdateHub(), "1", "^NSEI", datetime(2024, 1, 1), "2024-01-02")
+
+    event_id, data = _data(next(events))
+    events.close()
+
+    assert event_id == "2024-01-03"
+    assert data == {
+        "labels": ["2024-01-03"],
+        "fund_performance": [120.0],
+        "index_performance": [90.0],
+        "fund_actual_values": [12.0],
+        "index_actual_values": [90.0],
+    }
+
+
+def test_points_in_catch_up_and_poller_are_sent_once():
+    hub = UpdateHub()
+    events = stream_events(hub, "1", "^NSEI", datetime(2024, 1, 1), "2024-01-02")
+    next(events)
+
+    (subscriber,) = hub.pollers[("1", "^NSEI")].subscribers
+    subscriber.put(POINTS[2:])
+    event_id, data = _data(next(events))
+    events.close()
+
+    assert event_id == "2024-01-04"
+    assert data["labels"] == ["2024-01-04"]
+    assert not hub.pollers[("1", "^NSEI")].subscribers
+
+
+def test_subscribers_to_the_same_pair_share_one_poller():
+    hub = UpdateHub()
+
+    first, _ = hub.subscribe("1", "^NSEI", "2024-01-02")
+    second, _ = hub.subscribe("1", "^NSEI", "2024-01-02")
+
+    assert list(hub.pollers) == [("1", "^NSEI")]
+    assert hub.pollers[("1", "^NSEI")].subscribers == {first, second}
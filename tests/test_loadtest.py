@@ -0,0 +1,37 @@
+import math
+
+from backend.loadtest.run import Results, cache_state, percentile
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [10.0, 20.0, 30.0, 40.0, 50.0]
+
+    assert percentile(values, 0) == 10.0
+    assert percentile(values, 50) == 30.0
+    assert percentile(values, 95) == 48.0
+    assert percentile(values, 100) == 50.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_report_per_endpoint():
+    results = Results()
+    for latency in (30.0, 10.0, 20.0):
+        results.add("/api/compare (first)", latency, ok=True)
+    results.add("/api/compare (first)", 40.0, ok=False)
+
+    row = results.report(elapsed=2.0)["/api/compare (first)"]
+
+    assert row["requests"] == 4
+    assert row["throughput_rps"] == 2.0
+    assert row["error_rate"] == 0.25
+    assert row["p50_ms"] == 25.0
+    assert row["max_ms"] == 40.0
+
+
+def test_cache_state(tmp_path):
+    assert cache_state(str(tmp_path)) == "cold"
+
+    (tmp_path / "indices").mkdir()
+    (tmp_path / "indices" / "_NSEI.json").write_text("{}")
+
+    assert cache_state(str(tmp_path)) == "warm"
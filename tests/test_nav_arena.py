@@ -0,0 +1,51 @@
+import os
+from datetime import datetime
+
+import numpy as np
+
+from backend.nav_arena import NavArena, _read_index, _segment_path, nav_arena
+from backend.utils import fetch_fund_data
+
+
+def _history(navs):
+    # MFAPI returns newest first
+    return [
+        {"date": f"{day:02d}-01-2024", "nav": str(nav)}
+        for day, nav in reversed(list(enumerate(navs, start=1)))
+    ]
+
+
+def test_add_appends_segments_without_rewriting_others():
+    arena = NavArena()
+    arena.add({"A1": _history([10.0, 11.0])})
+    first_segment = _read_index()["schemes"]["A1"][0]
+
+    arena.add({"B1": _history([5.0, 6.0, 7.0])})
+
+    index = _read_index()
+    assert index["schemes"]["A1"][0] == first_segment
+    days, navs = arena.get("A1")
+    assert list(navs) == [10.0, 11.0]
+    assert days[0] < days[1]
+    assert list(arena.get("B1")[1]) == [5.0, 6.0, 7.0]
+
+
+def test_replaced_series_drops_unreferenced_segment():
+    arena = NavArena()
+    arena.add({"C1": _history([1.0, 2.0])})
+    old_segment = _read_index()["schemes"]["C1"][0]
+
+    arena.add({"C1": _history([3.0, 4.0])})
+
+    assert old_segment not in _read_index()["segments"]
+    assert not os.path.exists(_segment_path(old_segment))
+    assert list(arena.get("C1")[1]) == [3.0, 4.0]
+
+
+def test_fund_data_nav_column_is_a_view_into_the_arena():
+    nav_arena.add({"D1": _history([10.0, 11.0, 12.0, 13.0])})
+
+    df = fetch_fund_data("D1", datetime(2024, 1, 2), datetime(2024, 1, 3))
+
+    assert list(df["nav"]) == [11.0, 12.0]
+    assert np.shares_memory(df["nav"].to_numpy(), nav_arena.get("D1")[1])
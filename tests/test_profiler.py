@@ -0,0 +1,32 @@
+import backend.app as app_module
+from backend import profiler
+
+
+def test_sampled_profile_ignores_client_request_id(monkeypatch):
+    monkeypatch.setattr(profiler, "SAMPLE_RATE", 1.0)
+    client = app_module.app.test_client()
+
+    response = client.get("/api/indices", headers={"X-Request-ID": "victim-id"})
+
+    assert response.headers["X-Profile-Id"] != "victim-id"
+
+
+def test_admin_token_not_accepted_in_query_string(monkeypatch):
+    monkeypatch.setattr(profiler, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiler, "SAMPLE_RATE", 0)
+    client = app_module.app.test_client()
+
+    response = client.get("/api/indices?profile=1&admin_token=secret")
+
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_prune_keeps_newest_profiles(monkeypatch):
+    monkeypatch.setattr(profiler, "KEEP_PROFILES", 2)
+    sampler = profiler.StackSampler(0)
+    sampler.duration = 0
+    for request_id in ("p1", "p2", "p3"):
+        profiler.save_profile(request_id, sampler, {})
+
+    ids = {p["id"] for p in profiler.list_profiles()}
+    assert len(ids) == 2
@@ -0,0 +1,97 @@
+import math
+
+import pytest
+
+from backend.screener import METRICS, BenchmarkUnavailable, MetricsTable, classify
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("SBI PSU Fund - Direct Plan - Growth", ("equity", "direct", "growth")),
+        ("Aditya Birla Sun Life Banking & PSU Debt Fund  - DIRECT - IDCW", ("debt", "direct", "idcw")),
+        ("HDFC Hybrid Equity Fund - Growth Option - Direct Plan", ("hybrid", "direct", "growth")),
+        ("Axis ELSS Tax Saver Fund - Direct Plan - Growth Option", ("equity", "direct", "growth")),
+        ("Kotak Capital Protection Fund - Regular Plan", ("other", "regular", "other")),
+    ],
+)
+def test_classify(name, expected):
+    assert classify(name) == expected
+
+
+def _table(benchmarks):
+    funds = [
+        {
+            "schemeCode": code,
+            "schemeName": name,
+            "metrics": {**dict.fromkeys(METRICS, math.nan), "cagr_1y": cagr},
+        }
+        for code, name, cagr in [
+            ("1", "A Large Cap Fund - Direct Plan - Growth", 12.0),
+            ("2", "B Large Cap Fund - Direct Plan - Growth", 18.0),
+            ("3", "C Gilt Fund - Direct Plan - Growth", 7.0),
+        ]
+    ]
+    return MetricsTable(funds, benchmarks, "window")
+
+
+def test_query_filters_against_benchmark_and_sorts():
+    table = _table({"Nifty 50": {**dict.fromkeys(METRICS, math.nan), "cagr_1y": 10.0}})
+
+    count, rows = table.query({"category": "equity", "cagr_1y__gt": "Nifty 50"}, sort="-cagr_1y")
+
+    assert count == 2
+    assert [row["schemeCode"] for row in rows] == ["2", "1"]
+
+
+def test_query_with_unavailable_benchmark_is_not_a_client_error():
+    with pytest.raises(BenchmarkUnavailable):
+        _table({}).query({"cagr_1y__gt": "Nifty IT"})
+
+
+def test_query_rejects_non_positive_limit():
+    with pytest.raises(ValueError):
+        _table({}).query({}, limit=-1)
+
+
+@pytest.fixture
+def one_fund(monkeypatch, request):
+    from backend import screener
+
+    # A code no other test stores in the NAV arena, so the build has to fetch it
+    code = f"9{abs(hash(request.node.name)) % 10 ** 6:06d}"
+    monkeypatch.setattr(
+        screener, "ALL_FUNDS", [{"schemeCode": code, "schemeName": "A Large Cap Fund - Growth"}]
+    )
+    monkeypatch.setattr(screener, "INDICES", {"Nifty 50": "^NSEI"})
+    return screener
+
+
+def _mfapi_rows(count):
+    return [{"date": f"{day:02d}-01-2024", "nav": str(10 + day)} for day in range(1, count + 1)]
+
+
+def test_build_skips_empty_benchmark_history(one_fund, monkeypatch):
+    monkeypatch.setattr(one_fund, "fetch_fund_history", lambda code: _mfapi_rows(5))
+    monkeypatch.setattr(one_fund, "fetch_index_history", lambda symbol: [])
+
+    table = one_fund.build_table()
+
+    assert table.window is None
+    with pytest.raises(BenchmarkUnavailable):
+        table.query({"cagr_1y__gt": "Nifty 50"})
+
+
+def test_build_with_failed_fund_fetch_is_not_marked_current(one_fund, monkeypatch):
+    def fail(code):
+        raise ConnectionError("MFAPI down")
+
+    monkeypatch.setattr(one_fund, "fetch_fund_history", fail)
+    monkeypatch.setattr(
+        one_fund, "fetch_index_history", lambda symbol: [["2024-01-01", 100.0], ["2024-01-02", 101.0]]
+    )
+
+    table = one_fund.build_table()
+
+    assert table.window is None
+    assert "Nifty 50" in table.benchmarks